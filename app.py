@@ -1,11 +1,11 @@
 import streamlit as st
-import tensorflow as tf
-import pickle
-import numpy as np
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 import pandas as pd
 from datetime import datetime
+import queue
+import threading
+import time
 import json
+from shona_core import load_assets, ai_predict_split, SHONA_CLASS_MAP, select_best_class
 
 # Optional Google Sheets integration
 try:
@@ -18,67 +18,124 @@ except ImportError:
 # ------------------------------------------------
 # 1. GOOGLE SHEETS SETUP (Optional)
 # ------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def _open_worksheet(creds_dict, sheet_name):
+    """Authorize, open the log spreadsheet and check its headers once per credentials/sheet"""
+    # Setup credentials
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+    client = gspread.authorize(creds)
+    
+    # Open or create spreadsheet
+    try:
+        spreadsheet = client.open(sheet_name)
+    except gspread.SpreadsheetNotFound:
+        spreadsheet = client.create(sheet_name)
+        spreadsheet.share('', perm_type='anyone', role='reader')
+    
+    worksheet = spreadsheet.sheet1
+    
+    # Setup headers if empty
+    if worksheet.row_count == 0 or worksheet.acell('A1').value != 'Timestamp':
+        worksheet.update('A1:G1', [['Timestamp', 'Word', 'Prefix', 'Stem', 'Full Split', 'Class', 'Meaning']])
+    
+    return worksheet
+
 def init_google_sheets():
     """Initialize Google Sheets connection"""
     if not SHEETS_AVAILABLE:
         return None
     
+    # Get credentials from Streamlit secrets; checked every rerun so newly added secrets are seen
+    creds_dict = st.secrets.get("gcp_service_account", None)
+    if not creds_dict:
+        return None
+    sheet_name = st.secrets.get("sheet_name", "Shona Analysis Log")
+    
+    # Failures raise out of the cached call, so they are retried on the next rerun
     try:
-        # Get credentials from Streamlit secrets
-        creds_dict = st.secrets.get("gcp_service_account", None)
-        if not creds_dict:
-            return None
-        
-        # Setup credentials
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-        client = gspread.authorize(creds)
-        
-        # Open or create spreadsheet
-        sheet_name = st.secrets.get("sheet_name", "Shona Analysis Log")
-        try:
-            spreadsheet = client.open(sheet_name)
-        except gspread.SpreadsheetNotFound:
-            spreadsheet = client.create(sheet_name)
-            spreadsheet.share('', perm_type='anyone', role='reader')
-        
-        worksheet = spreadsheet.sheet1
-        
-        # Setup headers if empty
-        if worksheet.row_count == 0 or worksheet.acell('A1').value != 'Timestamp':
-            worksheet.update('A1:G1', [['Timestamp', 'Word', 'Prefix', 'Stem', 'Full Split', 'Class', 'Meaning']])
-        
-        return worksheet
+        return _open_worksheet(dict(creds_dict), sheet_name)
     except Exception as e:
         st.sidebar.error(f"Google Sheets error: {e}")
         return None
 
+SHEETS_RETRY_DELAY_S = 5
+
+def _sheets_writer(rows, status):
+    """Send everything queued since the last write as one append_rows call per worksheet"""
+    while True:
+        pending = [rows.get()]
+        while True:
+            try:
+                pending.append(rows.get_nowait())
+            except queue.Empty:
+                break
+
+        batches = {}
+        for worksheet, row in pending:
+            batches.setdefault(id(worksheet), (worksheet, []))[1].append(row)
+
+        failed = False
+        for worksheet, batch in batches.values():
+            try:
+                worksheet.append_rows(batch, value_input_option='RAW')
+            except Exception as e:
+                # Put the rows back so they go out with the next batch
+                status["error"] = str(e)
+                for row in batch:
+                    rows.put((worksheet, row))
+                failed = True
+        if failed:
+            time.sleep(SHEETS_RETRY_DELAY_S)
+        else:
+            status["error"] = None
+
+@st.cache_resource
+def get_sheets_queue():
+    """Start the shared Sheets writer thread and return its row queue and status"""
+    rows = queue.Queue()
+    status = {"error": None}
+    threading.Thread(target=_sheets_writer, args=(rows, status), daemon=True).start()
+    return rows, status
+
 def save_to_sheets(worksheet, word, prefix, stem, full_split, class_id, meaning):
-    """Save analysis to Google Sheets"""
-    try:
-        row = [
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            word,
-            prefix,
-            stem,
-            full_split,
-            class_id,
-            meaning
-        ]
-        worksheet.append_row(row)
-        return True
-    except Exception as e:
-        st.error(f"Failed to save to Google Sheets: {e}")
-        return False
+    """Queue analysis for the background Google Sheets writer"""
+    row = [
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        word,
+        prefix,
+        stem,
+        full_split,
+        class_id,
+        meaning
+    ]
+    rows, _ = get_sheets_queue()
+    rows.put((worksheet, row))
+
+def check_sheets_writes():
+    """Report the background writer's last failure and any rows still waiting"""
+    rows, status = get_sheets_queue()
+    if status["error"]:
+        st.error(f"Failed to save to Google Sheets (will retry): {status['error']}")
+    pending = rows.qsize()
+    if pending:
+        st.caption(f"{pending} row(s) waiting for Google Sheets")
 
 # ------------------------------------------------
 # 2. SESSION STATE FOR LOCAL HISTORY
 # ------------------------------------------------
-if 'analysis_history' not in st.session_state:
-    st.session_state.analysis_history = []
+HISTORY_COLUMNS = ("timestamp", "word", "prefix", "stem", "full_split", "class", "meaning")
+
+# History is stored column-wise (one list per field), oldest entry first
+if 'history_cols' not in st.session_state:
+    st.session_state.history_cols = {col: [] for col in HISTORY_COLUMNS}
+
+# Bumped on every history change so derived views are only rebuilt when stale
+st.session_state.setdefault('history_version', 0)
+st.session_state.setdefault('history_cache', {})
 
 def add_to_history(word, prefix, stem, full_split, class_id, meaning):
     """Add analysis to session history"""
@@ -91,157 +148,55 @@ def add_to_history(word, prefix, stem, full_split, class_id, meaning):
         "class": class_id,
         "meaning": meaning
     }
-    st.session_state.analysis_history.insert(0, entry)  # Add to beginning
+    cols = st.session_state.history_cols
+    for k, v in entry.items():
+        cols[k].append(v)
     
     # Keep only last 100 entries
-    if len(st.session_state.analysis_history) > 100:
-        st.session_state.analysis_history = st.session_state.analysis_history[:100]
+    if len(cols["word"]) > 100:
+        for k in cols:
+            cols[k] = cols[k][-100:]
+
+    st.session_state.history_version += 1
+
+def clear_history():
+    """Remove all entries from session history"""
+    st.session_state.history_cols = {col: [] for col in HISTORY_COLUMNS}
+    st.session_state.history_version += 1
+
+def has_history():
+    """Check whether the session has any analyses"""
+    return bool(st.session_state.history_cols["word"])
+
+def _cached_history_view(name, build):
+    """Return a derived view of the history, rebuilding it only after a change"""
+    cache = st.session_state.history_cache
+    version = st.session_state.history_version
+    if name not in cache or cache[name][0] != version:
+        cache[name] = (version, build())
+    return cache[name][1]
 
 def get_history_df():
     """Convert history to DataFrame"""
-    if not st.session_state.analysis_history:
+    if not has_history():
         return pd.DataFrame()
-    return pd.DataFrame(st.session_state.analysis_history)
-
-# ------------------------------------------------
-# 3. SHONA RULE-BASED DICTIONARY (FORTUNE)
-# ------------------------------------------------
-SHONA_CLASS_MAP = {
-    "mu": [
-        {"class": "1", "meaning": "Person/agent/people who undergo action indicated by agent", "number": "Singular", "plural": "va", "priority": 1},
-        {"class": "3", "meaning": "Tree/Atmospheric/body parts/manner of action", "number": "Singular", "plural": "mi", "priority": 2},
-        {"class": "18", "meaning": "Locative (Inside)", "number": "N/A", "plural": None, "priority": 3}
-    ],
-    "va": [
-        {"class": "2", "meaning": "People", "number": "Plural", "lemma_prefix": "mu", "priority": 1},
-        {"class": "2a", "meaning": "Honorific", "number": "N/A", "lemma_prefix": None, "priority": 2}
-    ],
-    "mi": [
-        {"class": "4", "meaning": "Trees/Misc", "number": "Plural", "lemma_prefix": "mu", "priority": 1}
-    ],
-    "chi": [
-        {"class": "7", "meaning": "Object/Lang", "number": "Singular", "plural": "zvi", "priority": 1}
-    ],
-    "zvi": [
-        {"class": "8", "meaning": "Objects", "number": "Plural", "lemma_prefix": "chi", "priority": 1}
-    ],
-    "ma": [
-        {"class": "6", "meaning": "Liquids/Big Things", "number": "Plural", "lemma_prefix": "ri", "priority": 1}
-    ],
-    "ri": [
-        {"class": "5", "meaning": "Large Object/Fruit", "number": "Singular", "plural": "ma", "priority": 1}
-    ],
-    "ru": [
-        {"class": "11", "meaning": "Long/Thin Object", "number": "Singular", "plural": "n", "priority": 1}
-    ],
-    "ka": [
-        {"class": "12", "meaning": "Diminutive (Small)", "number": "Singular", "plural": "tu", "priority": 1}
-    ],
-    "tu": [
-        {"class": "13", "meaning": "Diminutive Plural", "number": "Plural", "lemma_prefix": "ka", "priority": 1}
-    ],
-    "hu": [
-        {"class": "14", "meaning": "Abstract Quality", "number": "Abstract", "plural": None, "priority": 1}
-    ],
-    "ku": [
-        {"class": "15", "meaning": "Infinitive (To do)", "number": "N/A", "plural": None, "priority": 1},
-        {"class": "17", "meaning": "Locative (At/To)", "number": "N/A", "plural": None, "priority": 2}
-    ],
-    "pa": [
-        {"class": "16", "meaning": "Locative (At/On)", "number": "N/A", "plural": None, "priority": 1}
-    ],
-    "svi": [
-        {"class": "19", "meaning": "Diminutive/Pejorative (Small/Bad)", "number": "Singular", "plural": None, "priority": 1}
-    ],
-    "zi": [
-        {"class": "21", "meaning": "Augmentative/Pejorative (Large/Excessive)", "number": "Singular", "plural": None, "priority": 1}
-    ]
-}
-
-# Disambiguation: Common stem patterns
-PERSON_STEMS = ["nhu", "ntu", "kuru", "rume", "fazi", "ana", "komana", "sikana"]
-LOCATIVE_STEMS = ["munda", "minda", "musha", "rodhi", "gomo", "dziva"]
-TREE_STEMS = ["ti", "tondo", "pani", "ndo", "sasa", "tsamvu", "nzviro"]
-BODY_PART_STEMS = ["soro", "romo", "mhuno", "romo", "dzira"]
-
-def select_best_class(prefix, stem, candidates):
-    """Select the most appropriate noun class from multiple candidates"""
-    if len(candidates) == 1:
-        return candidates[0]
-    
-    stem_lower = stem.lower()
-    
-    # Special handling for "mu" prefix
-    if prefix == "mu":
-        # Class 18 locatives first
-        if any(stem_lower.startswith(s) or stem_lower == s for s in LOCATIVE_STEMS):
-            for c in candidates:
-                if c["class"] == "18":
-                    return c
-        
-        # Check for person stems
-        if any(stem_lower.startswith(s) or stem_lower == s for s in PERSON_STEMS):
-            return next(c for c in candidates if c["class"] == "1")
-        
-        # Check for tree stems
-        if any(stem_lower.startswith(s) or stem_lower == s for s in TREE_STEMS + BODY_PART_STEMS):
-            return next(c for c in candidates if c["class"] == "3")
-        
-        # Default to Class 1 (most common)
-        return candidates[0]
-    
-    # For "ku" prefix, prefer infinitive (Class 15)
-    if prefix == "ku":
-        return candidates[0]
-    
-    # For other cases, return highest priority
-    return min(candidates, key=lambda x: x.get("priority", 99))
-
-# ------------------------------------------------
-# 4. LOAD MODEL + TOKENIZER
-# ------------------------------------------------
-@st.cache_resource
-def load_assets():
-    model = tf.keras.models.load_model('shona_morphology_final.keras')
-    with open('tokenizer.pickle', 'rb') as handle:
-        tokenizer = pickle.load(handle)
-    return model, tokenizer
+    # Newest first for display
+    return _cached_history_view(
+        "df", lambda: pd.DataFrame(st.session_state.history_cols).iloc[::-1].reset_index(drop=True)
+    )
 
-model, tokenizer = load_assets()
-MAX_LEN = 30
+def get_history_csv():
+    """Serialize history to CSV for download"""
+    return _cached_history_view("csv", lambda: get_history_df().to_csv(index=False))
 
 # ------------------------------------------------
-# 5. AI PREDICTION FUNCTION
+# 3. MODEL WARM-UP
 # ------------------------------------------------
-def ai_predict_split(word):
-    seq = tokenizer.texts_to_sequences([word.lower()])
-    padded = pad_sequences(seq, maxlen=MAX_LEN, padding='post')
-    pred = model.predict(padded, verbose=0)[0]
-
-    split_word = ""
-    prefix = ""
-    stem = ""
-    split_found = False
-    
-    for i, char in enumerate(word):
-        if i < len(pred) and pred[i] > 0.5 and i < len(word) - 1 and not split_found:
-            split_word += char + "-"
-            prefix += char
-            split_found = True
-        else:
-            split_word += char
-            if split_found:
-                stem += char
-            else:
-                prefix += char
-
-    if not split_found:
-        return word, "", word
-
-    return split_word, prefix, stem
+# Load the shared model once at startup rather than on the first analysis
+load_assets()
 
 # ------------------------------------------------
-# 6. STREAMLIT UI
+# 4. STREAMLIT UI
 # ------------------------------------------------
 st.set_page_config(page_title="Shona Analyser", page_icon="🇿🇼")
 
@@ -257,6 +212,7 @@ with st.sidebar:
         if worksheet:
             st.success("✅ Google Sheets connected")
             enable_sheets = st.checkbox("Save to Google Sheets", value=True)
+            check_sheets_writes()
         else:
             st.warning("⚠️ Google Sheets not configured")
             st.info("Add Google Sheets credentials to Streamlit secrets to enable cloud storage.")
@@ -269,10 +225,9 @@ with st.sidebar:
     st.divider()
     
     # Download history button
-    if st.session_state.analysis_history:
+    if has_history():
         st.subheader("Export Data")
-        df = get_history_df()
-        csv = df.to_csv(index=False)
+        csv = get_history_csv()
         st.download_button(
             label="📥 Download History (CSV)",
             data=csv,
@@ -281,7 +236,7 @@ with st.sidebar:
         )
         
         if st.button("🗑️ Clear History"):
-            st.session_state.analysis_history = []
+            clear_history()
             st.rerun()
 
 # Tabs for analysis and history
@@ -331,8 +286,8 @@ with tab1:
                 
                 # Save to Google Sheets if enabled
                 if enable_sheets and worksheet:
-                    if save_to_sheets(worksheet, word_input, prefix, stem, full_split, best_candidate['class'], best_candidate['meaning']):
-                        st.success("💾 Saved to Google Sheets")
+                    save_to_sheets(worksheet, word_input, prefix, stem, full_split, best_candidate['class'], best_candidate['meaning'])
+                    st.success("💾 Sending to Google Sheets")
 
             else:
                 st.warning("Prefix not found in rule book (or it is a Zero Prefix noun like Class 5/9).")
@@ -350,7 +305,7 @@ with tab1:
 with tab2:
     st.write("### Recent Analyses")
     
-    if st.session_state.analysis_history:
+    if has_history():
         df = get_history_df()
         
         # Display stats
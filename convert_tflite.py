@@ -0,0 +1,44 @@
+# Converts shona_morphology_final.keras into an int8-quantized TFLite model.
+# Run once offline: python convert_tflite.py
+# shona_core.load_assets picks up 'shona_morph.tflite' automatically when it exists.
+
+import pickle
+import numpy as np
+import tensorflow as tf
+from model_config import MAX_LEN, TFLITE_MODEL_PATH
+
+KERAS_MODEL_PATH = 'shona_morphology_final.keras'
+
+model = tf.keras.models.load_model(KERAS_MODEL_PATH)
+with open('tokenizer.pickle', 'rb') as handle:
+    tokenizer = pickle.load(handle)
+
+# Fix the input to a single padded word so the LSTMs convert to fused TFLite ops
+infer = tf.function(lambda x: model(x, training=False)).get_concrete_function(
+    tf.TensorSpec([1, MAX_LEN], tf.float32)
+)
+
+def representative_dataset():
+    """Random character sequences of realistic word lengths for calibration"""
+    rng = np.random.default_rng(0)
+    vocab_size = len(tokenizer.word_index)
+    for _ in range(200):
+        length = rng.integers(3, 15)
+        sample = np.zeros((1, MAX_LEN), dtype=np.float32)
+        sample[0, :length] = rng.integers(1, vocab_size + 1, size=length)
+        yield [sample]
+
+converter = tf.lite.TFLiteConverter.from_concrete_functions([infer], model)
+converter.optimizations = [tf.lite.Optimize.DEFAULT]
+converter.representative_dataset = representative_dataset
+# Keep a float fallback for any op without an int8 kernel
+converter.target_spec.supported_ops = [
+    tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+    tf.lite.OpsSet.TFLITE_BUILTINS
+]
+tflite_model = converter.convert()
+
+with open(TFLITE_MODEL_PATH, 'wb') as f:
+    f.write(tflite_model)
+
+print(f"Saved {TFLITE_MODEL_PATH} ({len(tflite_model) / 1024:.1f} KB)")
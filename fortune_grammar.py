@@ -1,75 +1,94 @@
 # Save this as 'fortune_grammar.py' in your folder
 # Based on George Fortune's "Shona Grammatical Constructions"
 
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+class ClassEntry(NamedTuple):
+    cls: str
+    meaning: str
+    number: str
+    plural_prefix: Optional[str] = None
+    singular_prefix: Optional[str] = None
+
 SHONA_CLASS_MAP = {
     "mu": [
-        {"class": "1", "meaning": "Person", "number": "Singular", "plural_prefix": "va"},
-        {"class": "3", "meaning": "Tree/Atmospheric", "number": "Singular", "plural_prefix": "mi"},
-        {"class": "18", "meaning": "Locative (Inside)", "number": "N/A", "plural_prefix": None}
+        ClassEntry("1", "Person", "Singular", plural_prefix="va"),
+        ClassEntry("3", "Tree/Atmospheric", "Singular", plural_prefix="mi"),
+        ClassEntry("18", "Locative (Inside)", "N/A", plural_prefix=None)
     ],
     "va": [
-        {"class": "2", "meaning": "People (Plural of 1)", "number": "Plural", "singular_prefix": "mu"},
-        {"class": "2a", "meaning": "Honorific/Respect", "number": "N/A", "singular_prefix": None}
+        ClassEntry("2", "People (Plural of 1)", "Plural", singular_prefix="mu"),
+        ClassEntry("2a", "Honorific/Respect", "N/A", singular_prefix=None)
     ],
     "mi": [
-        {"class": "4", "meaning": "Trees/Miscellaneous (Plural of 3)", "number": "Plural", "singular_prefix": "mu"}
+        ClassEntry("4", "Trees/Miscellaneous (Plural of 3)", "Plural", singular_prefix="mu")
     ],
     "chi": [
-        {"class": "7", "meaning": "Object/Language/Short Person", "number": "Singular", "plural_prefix": "zvi"}
+        ClassEntry("7", "Object/Language/Short Person", "Singular", plural_prefix="zvi")
     ],
     "zvi": [
-        {"class": "8", "meaning": "Objects (Plural of 7)", "number": "Plural", "singular_prefix": "chi"}
+        ClassEntry("8", "Objects (Plural of 7)", "Plural", singular_prefix="chi")
     ],
     "ma": [
-        {"class": "6", "meaning": "Liquids/Plurals of Cl 5", "number": "Plural", "singular_prefix": "ri"}
+        ClassEntry("6", "Liquids/Plurals of Cl 5", "Plural", singular_prefix="ri")
     ],
     "ri": [
-        {"class": "5", "meaning": "Large Object/Fruit", "number": "Singular", "plural_prefix": "ma"}
+        ClassEntry("5", "Large Object/Fruit", "Singular", plural_prefix="ma")
     ],
     "ru": [
-        {"class": "11", "meaning": "Long/Thin Object or Abstract", "number": "Singular", "plural_prefix": "n"} # or ma-
+        ClassEntry("11", "Long/Thin Object or Abstract", "Singular", plural_prefix="n") # or ma-
     ],
     "ka": [
-        {"class": "12", "meaning": "Diminutive (Small)", "number": "Singular", "plural_prefix": "tu"}
+        ClassEntry("12", "Diminutive (Small)", "Singular", plural_prefix="tu")
     ],
     "tu": [
-        {"class": "13", "meaning": "Diminutive (Plural of 12)", "number": "Plural", "singular_prefix": "ka"}
+        ClassEntry("13", "Diminutive (Plural of 12)", "Plural", singular_prefix="ka")
     ],
     "hu": [
-        {"class": "14", "meaning": "Abstract Quality", "number": "Abstract", "plural_prefix": None}
+        ClassEntry("14", "Abstract Quality", "Abstract", plural_prefix=None)
     ],
     "ku": [
-        {"class": "15", "meaning": "Infinitive (To do)", "number": "N/A", "plural_prefix": None},
-        {"class": "17", "meaning": "Locative (At/To)", "number": "N/A", "plural_prefix": None}
+        ClassEntry("15", "Infinitive (To do)", "N/A", plural_prefix=None),
+        ClassEntry("17", "Locative (At/To)", "N/A", plural_prefix=None)
     ],
     "pa": [
-        {"class": "16", "meaning": "Locative (At/On)", "number": "N/A", "plural_prefix": None}
+        ClassEntry("16", "Locative (At/On)", "N/A", plural_prefix=None)
     ]
 }
 
+# Fallback for Class 1a, 5 (Zero prefix), 9 (Nasal)
+# This usually means the AI returned the whole word as stem or "No Prefix"
+_UNKNOWN_TUPLE = (
+    ClassEntry("Unknown (1a, 5, 9)", "No visible prefix", "Singular", plural_prefix="Unknown"),
+)
+
+# Lookup tables built once at import so the functions below are a single dict probe
+_ANALYSIS_CACHE = {}
+_LEMMA_PREFIX_MAP = {}
+for _prefix, _entries in SHONA_CLASS_MAP.items():
+    _ANALYSIS_CACHE[_prefix] = tuple(_entries)
+    # Plural entries take their singular prefix (e.g. zvi-bage -> chi-bage); others keep the
+    # caller's prefix as written, marked with None
+    _LEMMA_PREFIX_MAP[_prefix] = tuple(dict.fromkeys(
+        e.singular_prefix if e.number == "Plural" and e.singular_prefix else None
+        for e in _entries
+    ))
+
+def _prefix_key(prefix):
+    # Tokenizer output is almost always lowercase ASCII already; skip the lower() copy then
+    return prefix if prefix.isascii() and prefix.islower() else prefix.lower()
+
 def analyze_morphology(prefix, stem):
-    prefix = prefix.lower()
-    if prefix in SHONA_CLASS_MAP:
-        candidates = SHONA_CLASS_MAP[prefix]
-        # Heuristic: If multiple candidates, return all or try to guess?
-        # For now, we return all possibilities.
-        return candidates
-    else:
-        # Fallback for Class 1a, 5 (Zero prefix), 9 (Nasal)
-        # This usually means the AI returned the whole word as stem or "No Prefix"
-        return [{"class": "Unknown (1a, 5, 9)", "meaning": "No visible prefix", "number": "Singular", "plural_prefix": "Unknown"}]
+    # Heuristic: If multiple candidates, return all or try to guess?
+    # For now, we return all possibilities.
+    return _ANALYSIS_CACHE.get(_prefix_key(prefix), _UNKNOWN_TUPLE)
 
-def get_lemma(prefix, stem, analysis_list):
+@lru_cache(maxsize=4096)
+def get_lemma(prefix, stem):
     # Try to generate the Singular form (Lemma)
-    lemmas = []
-    for item in analysis_list:
-        if item.get("number") == "Plural" and item.get("singular_prefix"):
-            # Replace plural prefix with singular prefix
-            # e.g. zvi-bage -> chi-bage
-            lemmas.append(item["singular_prefix"] + stem)
-        elif item.get("number") == "Singular":
-            # Lemma is the word itself
-            lemmas.append(prefix + stem)
-        else:
-            lemmas.append(prefix + stem)
-    return list(set(lemmas)) # Unique lemmas
\ No newline at end of file
+    # The lemma prefixes depend only on the prefix; tuples keep cached results immutable
+    return tuple(
+        (prefix if p is None else p) + stem
+        for p in _LEMMA_PREFIX_MAP.get(_prefix_key(prefix), (None,))
+    )
@@ -0,0 +1,5 @@
+# Model constants shared by shona_core and the offline convert_tflite.py script.
+# Kept free of streamlit/tensorflow imports so scripts can read them cheaply.
+
+MAX_LEN = 30
+TFLITE_MODEL_PATH = 'shona_morph.tflite'
@@ -0,0 +1,240 @@
+# Shared morphology core: class map, model loading and segmentation.
+# UI modules import from here so the cached model is loaded once per process.
+
+import streamlit as st
+import tensorflow as tf
+import pickle
+import os
+import queue
+import threading
+import time
+import numpy as np
+from model_config import MAX_LEN, TFLITE_MODEL_PATH
+
+# ------------------------------------------------
+# 1. SHONA RULE-BASED DICTIONARY (FORTUNE)
+# ------------------------------------------------
+SHONA_CLASS_MAP = {
+    "mu": [
+        {"class": "1", "meaning": "Person/agent/people who undergo action indicated by agent", "number": "Singular", "plural": "va", "priority": 1},
+        {"class": "3", "meaning": "Tree/Atmospheric/body parts/manner of action", "number": "Singular", "plural": "mi", "priority": 2},
+        {"class": "18", "meaning": "Locative (Inside)", "number": "N/A", "plural": None, "priority": 3}
+    ],
+    "va": [
+        {"class": "2", "meaning": "People", "number": "Plural", "lemma_prefix": "mu", "priority": 1},
+        {"class": "2a", "meaning": "Honorific", "number": "N/A", "lemma_prefix": None, "priority": 2}
+    ],
+    "mi": [
+        {"class": "4", "meaning": "Trees/Misc", "number": "Plural", "lemma_prefix": "mu", "priority": 1}
+    ],
+    "chi": [
+        {"class": "7", "meaning": "Object/Lang", "number": "Singular", "plural": "zvi", "priority": 1}
+    ],
+    "zvi": [
+        {"class": "8", "meaning": "Objects", "number": "Plural", "lemma_prefix": "chi", "priority": 1}
+    ],
+    "ma": [
+        {"class": "6", "meaning": "Liquids/Big Things", "number": "Plural", "lemma_prefix": "ri", "priority": 1}
+    ],
+    "ri": [
+        {"class": "5", "meaning": "Large Object/Fruit", "number": "Singular", "plural": "ma", "priority": 1}
+    ],
+    "ru": [
+        {"class": "11", "meaning": "Long/Thin Object", "number": "Singular", "plural": "n", "priority": 1}
+    ],
+    "ka": [
+        {"class": "12", "meaning": "Diminutive (Small)", "number": "Singular", "plural": "tu", "priority": 1}
+    ],
+    "tu": [
+        {"class": "13", "meaning": "Diminutive Plural", "number": "Plural", "lemma_prefix": "ka", "priority": 1}
+    ],
+    "hu": [
+        {"class": "14", "meaning": "Abstract Quality", "number": "Abstract", "plural": None, "priority": 1}
+    ],
+    "ku": [
+        {"class": "15", "meaning": "Infinitive (To do)", "number": "N/A", "plural": None, "priority": 1},
+        {"class": "17", "meaning": "Locative (At/To)", "number": "N/A", "plural": None, "priority": 2}
+    ],
+    "pa": [
+        {"class": "16", "meaning": "Locative (At/On)", "number": "N/A", "plural": None, "priority": 1}
+    ],
+    "svi": [
+        {"class": "19", "meaning": "Diminutive/Pejorative (Small/Bad)", "number": "Singular", "plural": None, "priority": 1}
+    ],
+    "zi": [
+        {"class": "21", "meaning": "Augmentative/Pejorative (Large/Excessive)", "number": "Singular", "plural": None, "priority": 1}
+    ]
+}
+
+# Keep each candidate list ordered by priority so the best default is always first
+# (e.g. "ku" prefers the Class 15 infinitive over the Class 17 locative)
+for candidates in SHONA_CLASS_MAP.values():
+    candidates.sort(key=lambda c: c.get("priority", 99))
+
+# Prefixes that are safe to split without the model. Most class prefixes (ma, mu, ka, ku, zi,
+# svi...) are also ordinary syllables (mai, zimbabwe, svika), so only these skip the model.
+# Both are three letters, so a single tuple startswith() finds the split point.
+UNAMBIGUOUS_PREFIXES = ("chi", "zvi")
+UNAMBIGUOUS_PREFIX_LEN = 3
+
+# Disambiguation: Common stem patterns
+PERSON_STEMS = ["nhu", "ntu", "kuru", "rume", "fazi", "ana", "komana", "sikana"]
+LOCATIVE_STEMS = ["munda", "minda", "musha", "rodhi", "gomo", "dziva"]
+TREE_STEMS = ["ti", "tondo", "pani", "ndo", "sasa", "tsamvu", "nzviro"]
+BODY_PART_STEMS = ["soro", "romo", "mhuno", "romo", "dzira"]
+
+# "mu" disambiguation rules, checked in order: locatives, then people, then trees/body parts.
+# Tuples let str.startswith() test every stem in a single C call.
+MU_RULES = [
+    (tuple(LOCATIVE_STEMS), "18"),
+    (tuple(PERSON_STEMS), "1"),
+    (tuple(TREE_STEMS + BODY_PART_STEMS), "3")
+]
+
+def select_best_class(prefix, stem, candidates):
+    """Select the most appropriate noun class from multiple candidates"""
+    if len(candidates) == 1:
+        return candidates[0]
+    
+    stem_lower = stem.lower()
+    
+    # Special handling for "mu" prefix
+    if prefix == "mu":
+        for stems, class_id in MU_RULES:
+            if stem_lower.startswith(stems):
+                return next((c for c in candidates if c["class"] == class_id), candidates[0])
+        
+        # Default to Class 1 (most common)
+        return candidates[0]
+    
+    # For other cases, return highest priority (lists are pre-sorted)
+    return candidates[0]
+
+# ------------------------------------------------
+# 2. LOAD MODEL + TOKENIZER
+# ------------------------------------------------
+@st.cache_resource
+def load_assets():
+    with open('tokenizer.pickle', 'rb') as handle:
+        tokenizer = pickle.load(handle)
+    # Char-level tokenizer: bake char -> id into a byte lookup table (unknown chars -> 0)
+    char_lut = np.zeros(256, dtype=np.int32)
+    for ch, idx in tokenizer.word_index.items():
+        if len(ch) == 1 and ord(ch) < 256:
+            char_lut[ord(ch)] = idx
+
+    # Prefer the int8 TFLite build (see convert_tflite.py), fall back to the Keras model
+    if os.path.exists(TFLITE_MODEL_PATH):
+        interpreter = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH)
+        interpreter.allocate_tensors()
+        inp = interpreter.get_input_details()[0]
+        out_idx = interpreter.get_output_details()[0]['index']
+        # The interpreter is shared by every session and is not thread-safe
+        lock = threading.Lock()
+
+        def infer(padded):
+            with lock:
+                interpreter.set_tensor(inp['index'], padded.astype(inp['dtype']))
+                interpreter.invoke()
+                return interpreter.get_tensor(out_idx)
+
+        # The converted graph has a fixed batch of 1, so there is nothing to coalesce
+        batched = False
+    else:
+        model = tf.keras.models.load_model('shona_morphology_final.keras')
+        # Trace the forward pass once; model.predict() sets up a full batch loop per call
+        graph_fn = tf.function(lambda x: model(x, training=False)).get_concrete_function(
+            tf.TensorSpec([None, MAX_LEN], tf.int32)
+        )
+
+        def infer(padded):
+            return graph_fn(tf.constant(padded, dtype=tf.int32)).numpy()
+
+        batched = True
+
+    return char_lut, infer, batched
+
+# Concurrent predictions are coalesced into one forward pass of up to MAX_BATCH words
+# (Keras backend only; see load_assets)
+MAX_BATCH = 32
+BATCH_WAIT_S = 0.005
+
+def _batch_worker(requests, infer):
+    """Drain queued predictions into batches and run each batch once"""
+    while True:
+        batch = [requests.get()]
+        deadline = time.monotonic() + BATCH_WAIT_S
+        while len(batch) < MAX_BATCH:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        try:
+            preds = infer(np.concatenate([r["padded"] for r in batch]))
+            for r, pred in zip(batch, preds):
+                r["pred"] = pred
+        except Exception as e:
+            for r in batch:
+                r["error"] = e
+        for r in batch:
+            r["done"].set()
+
+@st.cache_resource
+def get_prediction_queue():
+    """Start the shared batching thread and return its request queue"""
+    _, infer, _ = load_assets()
+    requests = queue.Queue()
+    threading.Thread(target=_batch_worker, args=(requests, infer), daemon=True).start()
+    return requests
+
+def batched_infer(padded):
+    """Run one padded (1, MAX_LEN) sequence through the micro-batch queue"""
+    request = {"padded": padded, "done": threading.Event()}
+    get_prediction_queue().put(request)
+    request["done"].wait()
+    if "error" in request:
+        raise request["error"]
+    return request["pred"]
+
+# ------------------------------------------------
+# 3. AI PREDICTION FUNCTION
+# ------------------------------------------------
+def prefix_split(word):
+    """Split on an unambiguous class prefix, or return None if the word has none"""
+    if len(word) <= UNAMBIGUOUS_PREFIX_LEN or not word.lower().startswith(UNAMBIGUOUS_PREFIXES):
+        return None
+
+    k = UNAMBIGUOUS_PREFIX_LEN
+    prefix, stem = word[:k], word[k:]
+    return f"{prefix}-{stem}", prefix, stem
+
+@st.cache_data(max_entries=4096, show_spinner=False)
+def ai_predict_split(word):
+    # Unambiguous prefixes split deterministically; everything else goes to the model
+    split = prefix_split(word)
+    if split:
+        return split
+
+    # A split needs at least two characters; this also keeps the slice below from becoming [:-1]
+    if len(word) < 2:
+        return word, "", word
+
+    char_lut, infer, batched = load_assets()
+    # One byte per char ('?' for non-ASCII) keeps token positions aligned with the word
+    chars = np.frombuffer(word.lower().encode('ascii', 'replace'), dtype=np.uint8)[:MAX_LEN]
+    padded = np.zeros((1, MAX_LEN), dtype=np.int32)
+    padded[0, :chars.size] = char_lut[chars]
+    pred = batched_infer(padded) if batched else infer(padded)[0]
+
+    # First position past 0.5 (excluding the last char) marks the end of the prefix
+    split_idxs = np.nonzero(np.ravel(pred)[:len(word) - 1] > 0.5)[0]
+    if split_idxs.size == 0:
+        return word, "", word
+
+    k = int(split_idxs[0]) + 1
+    prefix, stem = word[:k], word[k:]
+    return f"{prefix}-{stem}", prefix, stem
@@ -4,22 +4,31 @@ from google.oauth2.service_account import Credentials
 
 st.title("Google Sheets Test")
 
+@st.cache_resource
+def _authorize(creds_dict):
+    """Authorize once per set of credentials and reuse the client (and its HTTP session)"""
+    # Setup credentials
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+    return gspread.authorize(creds)
+
+def _get_client():
+    # Get credentials from Streamlit secrets; read every run so added or rotated secrets are seen
+    creds_dict = st.secrets.get("gcp_service_account", None)
+    if not creds_dict:
+        return None
+    return _authorize(dict(creds_dict))
+
 # Test Google Sheets connection
 def test_google_sheets():
     try:
-        # Get credentials from Streamlit secrets
-        creds_dict = st.secrets.get("gcp_service_account", None)
-        if not creds_dict:
+        client = _get_client()
+        if client is None:
             return "No GCP service account credentials found in secrets."
 
-        # Setup credentials
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-        client = gspread.authorize(creds)
-
         # Try to open or create spreadsheet
         sheet_name = st.secrets.get("sheet_name", "Shona Analysis Log")
         try:
@@ -1,29 +1,85 @@
-import toml
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+import atexit
+import os
+from functools import lru_cache
 import gspread
 from google.oauth2.service_account import Credentials
 
-# Load secrets from .streamlit/secrets.toml
-with open('.streamlit/secrets.toml', 'r') as f:
-    secrets = toml.load(f)
+SECRETS_PATH = '.streamlit/secrets.toml'
+
+@lru_cache(maxsize=1)
+def _parse_secrets(mtime_ns):
+    """Parse secrets.toml; only the current file version is kept"""
+    with open(SECRETS_PATH, 'rb') as f:
+        return tomllib.load(f)
+
+def _secrets_mtime():
+    return os.stat(SECRETS_PATH).st_mtime_ns
+
+def _load_secrets():
+    """Load secrets from .streamlit/secrets.toml, re-reading only after the file changes"""
+    return _parse_secrets(_secrets_mtime())
+
+@lru_cache(maxsize=1)
+def _authorize(mtime_ns):
+    """Build the client from the secrets of a given file version"""
+    # Get credentials from secrets
+    creds_dict = _parse_secrets(mtime_ns).get("gcp_service_account", None)
+    if not creds_dict:
+        return None
+
+    # Setup credentials
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+    return gspread.authorize(creds)
+
+def _get_client():
+    """Reuse the client (and its HTTP session) until secrets.toml is edited"""
+    return _authorize(_secrets_mtime())
+
+# Rows queued by queue_row(), per worksheet: (spreadsheet id, sheet id) -> (worksheet, rows)
+_PENDING_ROWS = {}
+
+def queue_row(ws, row):
+    """Queue a row to be appended to ws on the next flush"""
+    key = (ws.spreadsheet.id, ws.id)
+    if key not in _PENDING_ROWS:
+        _PENDING_ROWS[key] = (ws, [])
+    _PENDING_ROWS[key][1].append(row)
+
+def flush_rows(ws):
+    """Append all rows queued for ws in a single API request"""
+    key = (ws.spreadsheet.id, ws.id)
+    if key not in _PENDING_ROWS:
+        return
+    ws.append_rows(_PENDING_ROWS[key][1], value_input_option='RAW')
+    # Only drop the rows once the request has succeeded
+    del _PENDING_ROWS[key]
+
+@atexit.register
+def _flush_all_rows():
+    """Make sure partial batches still reach their sheets when the script ends"""
+    for ws, rows in list(_PENDING_ROWS.values()):
+        try:
+            flush_rows(ws)
+        except Exception as e:
+            print(f"Failed to flush {len(rows)} row(s) to '{ws.title}': {str(e)}")
 
 # Test Google Sheets connection
 def test_google_sheets():
     try:
-        # Get credentials from secrets
-        creds_dict = secrets.get("gcp_service_account", None)
-        if not creds_dict:
+        client = _get_client()
+        if client is None:
             return "No GCP service account credentials found in secrets."
 
-        # Setup credentials
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-        client = gspread.authorize(creds)
-
         # Try to open or create spreadsheet
-        sheet_name = secrets.get("sheet_name", "Shona Analysis Log")
+        sheet_name = _load_secrets().get("sheet_name", "Shona Analysis Log")
         try:
             spreadsheet = client.open(sheet_name)
             return f"Successfully connected to existing spreadsheet: {sheet_name}"